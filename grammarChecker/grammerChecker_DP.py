@@ -5,10 +5,32 @@ import tkinter as tk
 from tkinter import scrolledtext, messagebox
 import json
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.compiledModel import CompiledModel, latest_model_dir
+from sinhalaNLP.correctionCascade import CorrectionCascade
+from sinhalaNLP.liveDictionary import LiveDictionary
+from sinhalaNLP.sinhalaTokenizer import replace_spans, tokenize, word_text
+from sinhalaNLP.timeBudget import DEFAULT_BUDGET, TimeBudget
 
 # Paths
 model_path = r"models\grammar_correction_model_final.keras"
 tokenizer_path = r"tokenizer.json"
+dictionary_path = r"sinhalaDictionary_creation\sinhalaDictionary.txt"
+pairs_path = r"grammar_dataset\sentence_pairs.csv"
+
+# Prefer the newest model exported by trainGrammar_DP.py, which comes with its own tokenizer
+latest_dir = latest_model_dir("models")
+if latest_dir:
+    model_path = os.path.join(latest_dir, "grammar_correction_model_final.keras")
+    tokenizer_path = os.path.join(latest_dir, "tokenizer.json")
+
+# Padded input length, used only if the model does not fix it itself
+max_length = 50
+
+# Seconds allowed per correction request
+correction_budget = DEFAULT_BUDGET
 
 # Verify if tokenizer file exists
 if not os.path.exists(tokenizer_path):
@@ -41,22 +63,65 @@ try:
         exit()
     
     model = tf.keras.models.load_model(model_path)
+    
+    # Trace and warm up fixed-shape inference functions once at load time,
+    # with the input shapes taken from the model itself
+    compiled_model = CompiledModel(model, max_length)
+    max_length = compiled_model.sequence_length
+    if compiled_model.fallback_reason:
+        print(f"Could not trace the model, using model.predict: {compiled_model.fallback_reason}")
+    else:
+        print("Per-call latency (ms) by batch size:",
+              {size: round(ms, 2) for size, ms in compiled_model.latency.items()})
 except Exception as e:
     messagebox.showerror("Error", f"Error loading model: {str(e)}")
     exit()
 
-# Function to correct a sentence
-def correct_sentence_deep_learning(sentence):
+# Rebuild one sentence from the model's per-position predictions. Padding
+# positions were never trained, so only positions that hold a word are read,
+# and words the tokenizer does not know (or that the model maps to padding or
+# <OOV>) are copied through unchanged. Punctuation and spacing are kept.
+def decode_prediction(sentence, input_ids, predicted_ids):
+    spans = list(tokenize(sentence))
+    if len(input_ids) != len(spans):
+        return sentence  # Words and ids cannot be lined up; leave the sentence as it is
+    oov_id = tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token else None
+    corrected = []
+    for (word, _, _), input_id, predicted_id in zip(spans, input_ids, predicted_ids):
+        if input_id == oov_id or predicted_id in (0, oov_id):
+            corrected.append(word)
+        else:
+            corrected.append(tokenizer.index_word.get(int(predicted_id), word))
+    return replace_spans(sentence, spans, corrected)
+
+# Function to correct a batch of sentences with a single model call.
+# The call has a fixed, warmed-up cost, so the budget is only checked by the
+# cascade before deciding to call it.
+def correct_sentences_deep_learning(sentences, budget=None):
     try:
-        seq = tokenizer.texts_to_sequences([sentence])
-        padded_seq = pad_sequences(seq, maxlen=50, padding='post')
-        prediction = model.predict(padded_seq, verbose=0)  # Added verbose=0 to reduce output
+        # Split into words the same way as the training data
+        seq = tokenizer.texts_to_sequences([word_text(sentence) for sentence in sentences])
+        padded_seq = pad_sequences(seq, maxlen=max_length, padding='post', truncating='post')
+        prediction = compiled_model(padded_seq)
         predicted_seq = tf.argmax(prediction, axis=-1).numpy()
-        corrected_sentence = tokenizer.sequences_to_texts(predicted_seq)[0]
-        return corrected_sentence
+        # Words past max_length are not seen by the model and map to themselves
+        return [decode_prediction(sentence, ids, list(predicted[:len(ids)]) + ids[max_length:])
+                for sentence, ids, predicted in zip(sentences, seq, predicted_seq)]
     except Exception as e:
         messagebox.showerror("Error", f"Error in sentence correction: {str(e)}")
-        return sentence  # Return original sentence if correction fails
+        return sentences  # Return original sentences if correction fails
+
+# Function to correct a sentence
+def correct_sentence_deep_learning(sentence, budget=None):
+    return correct_sentences_deep_learning([sentence], budget)[0]
+
+# Cheaper tiers settle most sentences before the model is called
+try:
+    dictionary = LiveDictionary(dictionary_path)
+    cascade = CorrectionCascade(pairs_path, dictionary, model=correct_sentences_deep_learning)
+except Exception as e:
+    messagebox.showerror("Error", f"Error loading correction resources: {str(e)}")
+    exit()
 
 # Function to process text input and correct grammar
 def dl_checker():
@@ -66,9 +131,11 @@ def dl_checker():
         return
 
     try:
-        corrected_text = "\n".join(
-            [correct_sentence_deep_learning(line) for line in input_text.split("\n") if line.strip()]
-        )
+        budget = TimeBudget(correction_budget)
+        dictionary.refresh()
+        lines = [line for line in input_text.split("\n") if line.strip()]
+        corrected_text = "\n".join(cascade.correct(lines, budget))
+        tier_label.config(text=f"{cascade.summary()}\n{budget.report()}")
         output_text_area.delete("1.0", tk.END)
         output_text_area.insert(tk.END, corrected_text)
     except Exception as e:
@@ -88,4 +155,8 @@ tk.Label(root, text="Corrected Text:", font=("Helvetica", 14)).pack(pady=5)
 output_text_area = scrolledtext.ScrolledText(root, width=60, height=10, font=("Helvetica", 12))
 output_text_area.pack(pady=10)
 
+# Share of sentences settled by each correction tier
+tier_label = tk.Label(root, text="", font=("Helvetica", 10))
+tier_label.pack(pady=5)
+
 root.mainloop()
\ No newline at end of file
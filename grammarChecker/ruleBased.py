@@ -1,51 +1,32 @@
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
-from difflib import get_close_matches
-import re
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.grammarRules import GRAMMAR_RULES, apply_grammar_rules, correct_grammar
+from sinhalaNLP.liveDictionary import LiveDictionary
+from sinhalaNLP.sinhalaTokenizer import sub_tokens, words
+from sinhalaNLP.timeBudget import (COMPLETED, DEFAULT_BUDGET, PARTIAL, SKIPPED, SPELLING_SHARE, TimeBudget,
+                                   closest_match)
+from sinhalaNLP.tokenAlignment import changes as token_changes, describe
 
 class SinhalaAutoCorrector:
     def __init__(self, root):
         self.root = root
         self.root.title("සිංහල ස්වයංක්‍රීය වචන හා ව්‍යාකරණ නිවැරදි කිරීම- Rule Based")
         self.root.geometry("800x600")
+        self.correction_budget = DEFAULT_BUDGET  # Seconds allowed per request
         
         try:
-            # Load dictionary of correct words
-            with open('sinhalaDictionary_creation\sinhalaDictionary.txt', 'r', encoding='utf-8') as f:
-                self.dictionary = set(f.read().splitlines())
+            # Load dictionary of correct words, including the user overlay
+            self.dictionary = LiveDictionary('sinhalaDictionary_creation\sinhalaDictionary.txt')
+            
+            # Confusion-set index for common substitution errors
+            self.confusion_index = self.dictionary.confusion_index
             
             # Define grammar rules
-            self.grammar_rules = {
-                # SOV word order patterns
-                'word_order': [
-                    {
-                        'pattern': r'(මම|අපි|ඔහු|ඇය|ඔවුන්)\s+(\w+මි|\w+යි|\w+ති)\s+([^.]+)',
-                        'correction': lambda m: f"{m.group(1)} {m.group(3)} {m.group(2)}"
-                    }
-                ],
-                # Question formation rules
-                'question': [
-                    {
-                        'pattern': r'(කොහි|කවුද|මොකද|කුමක්)\s*(?!ද)[.?]?$',
-                        'correction': lambda m: f"{m.group(1)}ද?"
-                    },
-                    {
-                        'pattern': r'(.+[^ද])[?]$',
-                        'correction': lambda m: f"{m.group(1)}ද?"
-                    }
-                ],
-                # Subject-verb agreement
-                'verb_agreement': [
-                    {
-                        'pattern': r'(මම)\s+.+?([^මි])[.?]?$',
-                        'correction': lambda m: f"{m.group(1)} {m.group(2)}මි"
-                    },
-                    {
-                        'pattern': r'(ඔහු|ඇය)\s+.+?([^යි])[.?]?$',
-                        'correction': lambda m: f"{m.group(1)} {m.group(2)}යි"
-                    }
-                ]
-            }
+            self.grammar_rules = GRAMMAR_RULES
             
         except Exception as e:
             messagebox.showerror("Error", f"Error loading resources: {str(e)}")
@@ -92,45 +73,39 @@ class SinhalaAutoCorrector:
                                              text="ව්‍යාකරණ නිරවද්යතාව: 0%", 
                                              font=("Iskoola Pota", 11))
         self.grammar_accuracy_label.pack(side=tk.RIGHT, padx=10)
+        
+        # Stages that ran within the time budget
+        self.budget_label = tk.Label(self.root, text="", font=("Iskoola Pota", 10))
+        self.budget_label.pack(pady=5)
 
-    def correct_spelling(self, word):
+    def correct_spelling(self, word, budget=None):
         """Apply spell checking using dictionary"""
         if word in self.dictionary:
             return word
             
-        # Find closest match in dictionary
-        matches = get_close_matches(word, self.dictionary, n=1, cutoff=0.8)
-        return matches[0] if matches else word
+        # Most misspellings only mix up confusable letters
+        match = self.confusion_index.lookup(word)
+        if match:
+            return match
+            
+        # Find closest match in dictionary, stopping at the deadline
+        match, completed = closest_match(word, self.dictionary, cutoff=0.8, budget=budget)
+        if budget is not None:
+            budget.record('spelling', COMPLETED if completed else PARTIAL)
+        return match if match else word
 
     def apply_grammar_rules(self, sentence, rule_type):
         """Apply specific grammar rules to the sentence"""
-        corrected = sentence
-        for rule in self.grammar_rules[rule_type]:
-            match = re.search(rule['pattern'], corrected)
-            if match:
-                corrected = rule['correction'](match)
-        return corrected
+        return apply_grammar_rules(sentence, rule_type, self.grammar_rules)
 
     def correct_grammar(self, sentence):
         """Apply all grammar rules in sequence"""
-        corrected = sentence
-        
-        # Check and correct word order (SOV)
-        corrected = self.apply_grammar_rules(corrected, 'word_order')
-        
-        # Check and correct question formation
-        if '?' in corrected or any(q in corrected.lower() for q in ['කොහි', 'කවුද', 'මොකද', 'කුමක්']):
-            corrected = self.apply_grammar_rules(corrected, 'question')
-        
-        # Check and correct verb agreement
-        corrected = self.apply_grammar_rules(corrected, 'verb_agreement')
-        
-        return corrected
+        return correct_grammar(sentence, self.grammar_rules)
 
     def calculate_accuracy(self, original, corrected):
         """Calculate similarity between original and corrected text"""
-        words1 = set(original.split())
-        words2 = set(corrected.split())
+        words1 = set(words(original))
+        words2 = set(words(corrected))
         intersection = len(words1.intersection(words2))
         union = len(words1.union(words2))
         return (intersection / union * 100) if union > 0 else 100
@@ -141,6 +116,13 @@ class SinhalaAutoCorrector:
             messagebox.showwarning("Warning", "කරුණාකර පාඨයක් ඇතුළත් කරන්න")
             return
             
+        budget = TimeBudget(self.correction_budget)
+        # Spelling may only use part of it, so grammar correction still runs
+        spelling_budget = budget.share(SPELLING_SHARE)
+        
+        # Pick up words added to or removed from the overlay since the last run
+        self.dictionary.refresh()
+        
         sentences = [s.strip() for s in text.split('.') if s.strip()]
         corrected_sentences = []
         changes = []
@@ -150,21 +132,18 @@ class SinhalaAutoCorrector:
         
         for sentence in sentences:
             # Spelling correction
-            words = sentence.split()
-            corrected_words = []
-            
-            for word in words:
-                corrected = self.correct_spelling(word)
-                if corrected != word:
-                    changes.append(f"Spelling: {word} → {corrected}")
-                corrected_words.append(corrected)
-            
-            spell_corrected = ' '.join(corrected_words)
+            spell_corrected = sub_tokens(sentence, lambda word: self.correct_spelling(word, spelling_budget))
+            changes.extend(f"Spelling: {describe(edit)}" for edit in token_changes(sentence, spell_corrected))
             
-            # Grammar correction
-            grammar_corrected = self.correct_grammar(spell_corrected)
-            if grammar_corrected != spell_corrected:
-                changes.append(f"Grammar: {spell_corrected} → {grammar_corrected}")
+            # Grammar correction, skipped once the budget is spent
+            if budget.expired():
+                budget.record('grammar', SKIPPED)
+                grammar_corrected = spell_corrected
+            else:
+                grammar_corrected = self.correct_grammar(spell_corrected)
+                budget.record('grammar', COMPLETED)
+            changes.extend(f"Grammar: {describe(edit)}"
+                           for edit in token_changes(spell_corrected, grammar_corrected))
             
             # Calculate accuracies
             spelling_accuracy = self.calculate_accuracy(sentence, spell_corrected)
@@ -188,6 +167,7 @@ class SinhalaAutoCorrector:
         final_text = '. '.join(corrected_sentences) + ('?' if text.strip().endswith('?') else '.')
         self.output_text.delete("1.0", tk.END)
         self.output_text.insert("1.0", final_text)
+        self.budget_label.config(text=budget.report())
         
         # Show corrections
         if changes:
@@ -0,0 +1,248 @@
+"""
+Training entry point for the deep learning grammar correction model used by
+grammerChecker_DP.py.
+
+The model reads a padded sequence of word ids and predicts the corrected word
+id at every position. Sentences are split into words with the shared Sinhala
+tokenizer, so punctuation never becomes part of a word. Sentence pairs are streamed from sentence_pairs.csv,
+tokenized once and cached, grouped into length buckets so that short
+sentences are not padded to the longest one, and prefetched while the
+previous batch trains. The model is checkpointed after every epoch so an
+interrupted run resumes where it stopped, and the finished model is exported
+together with its tokenizer into a new versioned directory under models/,
+where grammerChecker_DP.py picks up the newest one.
+
+Usage:
+    python grammarChecker/trainGrammar_DP.py [--epochs N] [--batch-size N]
+                                             [--intra-threads N] [--inter-threads N] [--disk-cache]
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow.keras.preprocessing.text import Tokenizer, tokenizer_from_json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.compiledModel import MODEL_VERSION_PREFIX, model_versions
+from sinhalaNLP.sinhalaTokenizer import word_text
+
+# Paths
+DATASET_PATH = os.path.join("grammar_dataset", "sentence_pairs.csv")
+MODELS_DIR = "models"
+CHECKPOINT_DIR = os.path.join(MODELS_DIR, "checkpoints")
+
+# Must match max_length in grammerChecker_DP.py
+MAX_LENGTH = 50
+
+# Upper sequence lengths of the batching buckets
+BUCKET_BOUNDARIES = [8, 16, 32]
+
+# Share of input words replaced by <OOV> each epoch, so the model learns to
+# leave words outside its vocabulary alone
+OOV_RATE = 0.05
+
+# File prefix of the tf.data cache, kept with the checkpoint whose tokenizer
+# produced it
+CACHE_PREFIX = "dataset.cache"
+
+EMBEDDING_DIM = 128
+LSTM_UNITS = 128
+
+
+def configure_threads(intra_threads, inter_threads):
+    """Set TensorFlow's CPU thread pools. Must run before any TensorFlow op."""
+    tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+
+
+def read_sentence_pairs(path=DATASET_PATH):
+    """
+    Yield (incorrect, correct) sentence pairs from the dataset one row at a
+    time, as space-separated words.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        for row in reader:
+            if len(row) >= 2:
+                incorrect, correct = word_text(row[0]), word_text(row[1])
+                if incorrect and correct:
+                    yield incorrect, correct
+
+
+def build_tokenizer(path=DATASET_PATH):
+    """Fit a word tokenizer on both columns and return it with the number of pairs."""
+    # Text is already split into words, so the tokenizer only splits on spaces
+    tokenizer = Tokenizer(filters='', lower=False, oov_token='<OOV>')
+    count = 0
+    for incorrect, correct in read_sentence_pairs(path):
+        tokenizer.fit_on_texts([incorrect, correct])
+        count += 1
+    return tokenizer, count
+
+
+def make_dataset(tokenizer, batch_size, path=DATASET_PATH, cache_path=''):
+    """
+    Streaming input pipeline: pairs are tokenized on the first epoch and
+    cached, then shuffled, partly masked with <OOV>, batched by length and
+    prefetched. cache_path must belong to the same tokenizer.
+    """
+    oov_id = tokenizer.word_index[tokenizer.oov_token]
+
+    def drop_words(source, target):
+        # Words left unchanged by the correction become <OOV> on both sides
+        drop = ((tf.random.uniform(tf.shape(source)) < OOV_RATE)
+                & (source > 0) & tf.equal(source, target))
+        return (tf.where(drop, oov_id, source), tf.where(drop, oov_id, target))
+
+    def encoded_pairs():
+        for incorrect, correct in read_sentence_pairs(path):
+            source, target = tokenizer.texts_to_sequences([incorrect, correct])
+            source, target = source[:MAX_LENGTH], target[:MAX_LENGTH]
+            # Input and target share one length so every position has a label
+            length = max(len(source), len(target))
+            yield (source + [0] * (length - len(source)),
+                   target + [0] * (length - len(target)))
+
+    dataset = tf.data.Dataset.from_generator(
+        encoded_pairs,
+        output_signature=(tf.TensorSpec((None,), tf.int32), tf.TensorSpec((None,), tf.int32)))
+
+    # Larger batches for shorter sentences keep the work per batch roughly even
+    bucket_batch_sizes = [batch_size * 4, batch_size * 2, batch_size, max(batch_size // 2, 1)]
+    return (dataset
+            .cache(cache_path)
+            .shuffle(1024, reshuffle_each_iteration=True)
+            .map(drop_words, num_parallel_calls=tf.data.AUTOTUNE)
+            .bucket_by_sequence_length(
+                element_length_func=lambda source, target: tf.shape(source)[0],
+                bucket_boundaries=BUCKET_BOUNDARIES,
+                bucket_batch_sizes=bucket_batch_sizes)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+def build_model(vocab_size):
+    inputs = tf.keras.Input(shape=(None,), dtype='int32')
+    x = tf.keras.layers.Embedding(vocab_size, EMBEDDING_DIM, mask_zero=True)(inputs)
+    x = tf.keras.layers.Bidirectional(tf.keras.layers.LSTM(LSTM_UNITS, return_sequences=True))(x)
+    outputs = tf.keras.layers.Dense(vocab_size, activation='softmax')(x)
+    model = tf.keras.Model(inputs, outputs)
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+class EpochCheckpoint(tf.keras.callbacks.Callback):
+    """Reports sentences/s and saves a resumable checkpoint after every epoch."""
+
+    def __init__(self, sentence_count, checkpoint_dir=CHECKPOINT_DIR):
+        super().__init__()
+        self.sentence_count = sentence_count
+        self.checkpoint_dir = checkpoint_dir
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.epoch_start
+        print(f"Epoch {epoch + 1}: {self.sentence_count / elapsed:.1f} sentences/s "
+              f"({elapsed:.1f}s, loss {logs.get('loss', float('nan')):.4f})")
+
+        # Write to temporary files first so a crash never leaves a broken checkpoint
+        model_path = os.path.join(self.checkpoint_dir, "checkpoint.keras")
+        temp_path = os.path.join(self.checkpoint_dir, "checkpoint.tmp.keras")
+        self.model.save(temp_path)
+        os.replace(temp_path, model_path)
+        with open(os.path.join(self.checkpoint_dir, "state.json"), 'w', encoding='utf-8') as f:
+            json.dump({'epoch': epoch + 1}, f)
+
+
+def load_checkpoint(checkpoint_dir=CHECKPOINT_DIR):
+    """Return (model, tokenizer, completed epochs) of an interrupted run, or None."""
+    model_path = os.path.join(checkpoint_dir, "checkpoint.keras")
+    state_path = os.path.join(checkpoint_dir, "state.json")
+    tokenizer_path = os.path.join(checkpoint_dir, "tokenizer.json")
+    if not all(os.path.exists(p) for p in (model_path, state_path, tokenizer_path)):
+        return None
+    with open(tokenizer_path, 'r', encoding='utf-8') as f:
+        tokenizer = tokenizer_from_json(f.read())
+    with open(state_path, 'r', encoding='utf-8') as f:
+        epoch = json.load(f)['epoch']
+    return tf.keras.models.load_model(model_path), tokenizer, epoch
+
+
+def export_model(model, tokenizer, metadata, models_dir=MODELS_DIR):
+    """Save the model, its tokenizer and metadata into the next versioned directory."""
+    version = max(model_versions(models_dir), default=0) + 1
+    export_dir = os.path.join(models_dir, f"{MODEL_VERSION_PREFIX}{version}")
+    os.makedirs(export_dir)
+
+    model.save(os.path.join(export_dir, "grammar_correction_model_final.keras"))
+    with open(os.path.join(export_dir, "tokenizer.json"), 'w', encoding='utf-8') as f:
+        f.write(tokenizer.to_json(ensure_ascii=False))
+    with open(os.path.join(export_dir, "metadata.json"), 'w', encoding='utf-8') as f:
+        json.dump({'version': version, **metadata}, f, ensure_ascii=False, indent=2)
+    return export_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Sinhala grammar correction model")
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--intra-threads', type=int, default=os.cpu_count() or 1,
+                        help="threads used inside a single op (default: all cores)")
+    parser.add_argument('--inter-threads', type=int, default=2,
+                        help="ops run in parallel (default: 2)")
+    parser.add_argument('--disk-cache', action='store_true',
+                        help="cache tokenized data in the checkpoint directory instead of memory")
+    args = parser.parse_args()
+
+    configure_threads(args.intra_threads, args.inter_threads)
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+    checkpoint = load_checkpoint()
+    if checkpoint:
+        model, tokenizer, initial_epoch = checkpoint
+        sentence_count = sum(1 for _ in read_sentence_pairs())
+        print(f"Resuming from checkpoint after epoch {initial_epoch}")
+    else:
+        # A cache left by an interrupted first epoch holds ids of an older tokenizer
+        for name in os.listdir(CHECKPOINT_DIR):
+            if name.startswith(CACHE_PREFIX):
+                os.remove(os.path.join(CHECKPOINT_DIR, name))
+        tokenizer, sentence_count = build_tokenizer()
+        with open(os.path.join(CHECKPOINT_DIR, "tokenizer.json"), 'w', encoding='utf-8') as f:
+            f.write(tokenizer.to_json(ensure_ascii=False))
+        model = build_model(len(tokenizer.word_index) + 1)
+        initial_epoch = 0
+
+    print(f"Training on {sentence_count} sentence pairs, vocabulary {len(tokenizer.word_index) + 1}")
+    # The cache is removed together with the checkpoint, so it never outlives its tokenizer
+    cache_path = os.path.join(CHECKPOINT_DIR, CACHE_PREFIX) if args.disk_cache else ''
+    dataset = make_dataset(tokenizer, args.batch_size, cache_path=cache_path)
+    history = model.fit(dataset, epochs=args.epochs, initial_epoch=initial_epoch,
+                        callbacks=[EpochCheckpoint(sentence_count)], verbose=2)
+
+    export_dir = export_model(model, tokenizer, {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'dataset': DATASET_PATH,
+        'sentence_pairs': sentence_count,
+        'vocabulary_size': len(tokenizer.word_index) + 1,
+        'max_length': MAX_LENGTH,
+        'tokenization': 'sinhalaNLP.sinhalaTokenizer.word_text',
+        'epochs': args.epochs,
+        'final_loss': (history.history.get('loss') or [None])[-1],
+    })
+    print(f"Model and tokenizer exported to: {export_dir}")
+
+    # The run is complete, so the next one starts from scratch
+    shutil.rmtree(CHECKPOINT_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,13 @@
-import re
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.confusionIndex import ConfusionIndex, index_path_for
+from sinhalaNLP.sinhalaTokenizer import iter_tokens
 
 # Path to the Sinhala dataset
 dataset_path = r'sinhalaDictionary_creation\textfiles'
 
-# Function to extract Sinhala words from text
-def extract_sinhala_words(text):
-    """
-    Extracts Sinhala words using a Unicode range for Sinhala characters.
-    """
-    sinhala_words = re.findall(r'[\u0D80-\u0DFF]+', text)  # Matches Sinhala Unicode characters
-    return sinhala_words
-
 # Dictionary to store unique Sinhala words
 sinhala_word_set = set()
 
@@ -22,10 +18,8 @@ for root, dirs, file_list in os.walk(dataset_path):
             file_path = os.path.join(root, file_name)
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                    # Extract and add Sinhala words to the set
-                    words = extract_sinhala_words(text)
-                    sinhala_word_set.update(words)
+                    # Stream the file through the shared tokenizer
+                    sinhala_word_set.update(token for token, _, _ in iter_tokens(f))
             except Exception as e:
                 print(f"Error reading file {file_name}: {e}")
 
@@ -40,3 +34,11 @@ try:
     print(f"Sinhala dictionary successfully created at: {output_path}")
 except Exception as e:
     print(f"Error writing dictionary file: {e}")
+
+# Build the confusion-set index next to the dictionary
+try:
+    index_path = index_path_for(output_path)
+    ConfusionIndex.from_words(sinhala_word_set).save(index_path)
+    print(f"Confusion index successfully created at: {index_path}")
+except Exception as e:
+    print(f"Error writing confusion index file: {e}")
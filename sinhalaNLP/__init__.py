@@ -0,0 +1 @@
+"""Shared Sinhala text utilities used by the dictionary builder and the checkers."""
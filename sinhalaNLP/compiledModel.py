@@ -0,0 +1,118 @@
+"""
+Low-overhead inference for the Keras grammar models.
+
+model.predict builds a data adapter, runs callbacks and may retrace for every
+new input shape, which dominates the cost of the one- or two-sentence requests
+served by the GUIs. CompiledModel traces one concrete function per batch-size
+bucket when it is created, warms them up, and afterwards calls the model
+directly with inputs padded up to the nearest bucket.
+
+The number of inputs, their dtypes and the sequence length are read from
+model.inputs, so the signatures always match the saved model. If tracing
+fails anyway, CompiledModel falls back to model.predict instead of failing.
+"""
+import os
+import time
+import numpy as np
+import tensorflow as tf
+
+# Batch sizes that get their own concrete function
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+# Directories under models/ that trainGrammar_DP.py exports to, e.g. grammar_correction_v3
+MODEL_VERSION_PREFIX = 'grammar_correction_v'
+
+
+def model_versions(models_dir):
+    """Return {version: directory} of the exported models in models_dir."""
+    if not os.path.isdir(models_dir):
+        return {}
+    return {int(name[len(MODEL_VERSION_PREFIX):]): os.path.join(models_dir, name)
+            for name in os.listdir(models_dir)
+            if name.startswith(MODEL_VERSION_PREFIX) and name[len(MODEL_VERSION_PREFIX):].isdigit()}
+
+
+def latest_model_dir(models_dir):
+    """Return the directory of the newest exported model, or None."""
+    versions = model_versions(models_dir)
+    return versions[max(versions)] if versions else None
+
+
+class CompiledModel:
+    """Calls a Keras model through pre-traced, fixed-signature functions."""
+
+    def __init__(self, model, sequence_length=None, batch_buckets=BATCH_BUCKETS, warmup_runs=5):
+        """
+        sequence_length is only used when the model's inputs do not fix it
+        themselves, e.g. models built with Input(shape=(None,)).
+        """
+        self.model = model
+        self.batch_buckets = tuple(sorted(batch_buckets))
+
+        inputs = getattr(model, 'inputs', None) or [None]
+        self.dtypes = [tf.int32 if t is None else tf.as_dtype(t.dtype) for t in inputs]
+        model_lengths = {t.shape[1] for t in inputs
+                         if t is not None and len(t.shape) > 1 and t.shape[1] is not None}
+        self.sequence_length = model_lengths.pop() if len(model_lengths) == 1 else sequence_length
+
+        # Mean per-call latency of every bucket in milliseconds
+        self.latency = {}
+        self.functions = {}
+        # Why tracing failed, when model.predict is used instead
+        self.fallback_reason = None
+        try:
+            if len(model_lengths) > 1:
+                raise ValueError(f"model inputs have different sequence lengths {sorted(model_lengths)}")
+            if self.sequence_length is None:
+                raise ValueError("the model does not fix its sequence length and none was given")
+            function = tf.function(self._call)
+            self.functions = {
+                batch_size: function.get_concrete_function(
+                    *[tf.TensorSpec((batch_size, self.sequence_length), dtype) for dtype in self.dtypes])
+                for batch_size in self.batch_buckets
+            }
+            self.warm_up(warmup_runs)
+        except Exception as e:
+            self.functions = {}
+            self.latency = {}
+            self.fallback_reason = str(e)
+
+    @property
+    def input_count(self):
+        return len(self.dtypes)
+
+    def _call(self, *inputs):
+        return self.model(inputs[0] if len(inputs) == 1 else list(inputs), training=False)
+
+    def warm_up(self, runs=5):
+        """Run every bucket and record its mean per-call latency."""
+        for batch_size, function in self.functions.items():
+            inputs = [tf.zeros((batch_size, self.sequence_length), dtype) for dtype in self.dtypes]
+            function(*inputs)
+            start = time.perf_counter()
+            for _ in range(runs):
+                function(*inputs)
+            self.latency[batch_size] = (time.perf_counter() - start) / max(runs, 1) * 1000
+
+    def __call__(self, *inputs):
+        """
+        Run the model on one (batch, sequence_length) array per model input and
+        return its output as a numpy array. Batches larger than the biggest
+        bucket are processed in several calls.
+        """
+        if len(inputs) != len(self.dtypes):
+            raise ValueError(f"Model takes {len(self.dtypes)} input(s), got {len(inputs)}")
+        inputs = [np.asarray(x) for x in inputs]
+        if not self.functions:
+            return self.model.predict(inputs[0] if len(inputs) == 1 else inputs, verbose=0)
+
+        largest = self.batch_buckets[-1]
+        outputs = []
+        for start in range(0, len(inputs[0]), largest):
+            chunk = [x[start:start + largest] for x in inputs]
+            count = len(chunk[0])
+            bucket = next(b for b in self.batch_buckets if b >= count)
+            padded = [tf.constant(np.pad(x, ((0, bucket - count), (0, 0))), dtype=dtype)
+                      for x, dtype in zip(chunk, self.dtypes)]
+            outputs.append(self.functions[bucket](*padded).numpy()[:count])
+        return np.concatenate(outputs)
@@ -0,0 +1,152 @@
+"""
+Confusion-set index for Sinhala spelling correction.
+
+Most Sinhala misspellings are substitutions inside a small set of confusable
+letters (ල/ළ, න/ණ, ශ/ෂ/ස, short/long vowels, aspirated/unaspirated stops) or
+a missing zero-width joiner in yansaya/rakaransaya. Every dictionary word is
+mapped to a key in which those classes are collapsed, so a misspelling that
+only mixes them up is corrected with one dict lookup and the expensive fuzzy
+search only runs on misses.
+"""
+import bisect
+import json
+import os
+from difflib import SequenceMatcher
+
+# File written next to sinhalaDictionary.txt by dictionaryCode.py
+INDEX_FILE_NAME = 'sinhalaConfusionIndex.json'
+
+# Each confusable letter is mapped onto one representative of its class
+CONFUSION_CLASSES = {
+    # Retroflex / dental pairs
+    'ළ': 'ල',
+    'ණ': 'න',
+    # Sibilants
+    'ශ': 'ස',
+    'ෂ': 'ස',
+    # Aspirated (mahaprana) -> unaspirated (alpaprana) stops
+    'ඛ': 'ක',
+    'ඝ': 'ග',
+    'ඡ': 'ච',
+    'ඣ': 'ජ',
+    'ඨ': 'ට',
+    'ඪ': 'ඩ',
+    'ථ': 'ත',
+    'ධ': 'ද',
+    'ඵ': 'ප',
+    'භ': 'බ',
+    # Long -> short independent vowels
+    'ආ': 'අ',
+    'ඈ': 'ඇ',
+    'ඊ': 'ඉ',
+    'ඌ': 'උ',
+    'ඎ': 'ඍ',
+    'ඒ': 'එ',
+    'ඕ': 'ඔ',
+    # Long -> short vowel signs
+    'ෑ': 'ැ',
+    'ී': 'ි',
+    'ූ': 'ු',
+    'ෲ': 'ෘ',
+    'ේ': 'ෙ',
+    'ෝ': 'ො',
+}
+
+# Joiners only change how a conjunct is rendered, so they are dropped
+_IGNORED = '\u200c\u200d'
+
+_KEY_TABLE = str.maketrans({**CONFUSION_CLASSES, **{c: None for c in _IGNORED}})
+
+
+def confusion_key(word):
+    """Return the normalised key of a word with all confusable letters collapsed."""
+    return word.translate(_KEY_TABLE)
+
+
+def index_path_for(dictionary_path):
+    """Return the path of the index file that belongs to a dictionary file."""
+    return os.path.join(os.path.dirname(dictionary_path), INDEX_FILE_NAME)
+
+
+class ConfusionIndex:
+    """Maps confusion keys to the dictionary words that share them."""
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets if buckets is not None else {}
+        self.lookups = 0
+        self.hits = 0
+
+    @classmethod
+    def from_words(cls, words):
+        buckets = {}
+        for word in words:
+            buckets.setdefault(confusion_key(word), []).append(word)
+        for candidates in buckets.values():
+            candidates.sort()
+        return cls(buckets)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def for_dictionary(cls, dictionary_path, words):
+        """
+        Load the index built next to the dictionary, or build it from the
+        given words if the file is missing or older than the dictionary.
+        """
+        path = index_path_for(dictionary_path)
+        try:
+            if os.path.getmtime(path) >= os.path.getmtime(dictionary_path):
+                return cls.load(path)
+        except (OSError, ValueError):
+            pass
+        return cls.from_words(words)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.buckets, f, ensure_ascii=False, sort_keys=True)
+
+    def add(self, word):
+        """Insert a dictionary word into its bucket."""
+        candidates = self.buckets.setdefault(confusion_key(word), [])
+        position = bisect.bisect_left(candidates, word)
+        if position == len(candidates) or candidates[position] != word:
+            candidates.insert(position, word)
+
+    def remove(self, word):
+        """Delete a dictionary word from its bucket."""
+        key = confusion_key(word)
+        candidates = self.buckets.get(key)
+        if candidates and word in candidates:
+            candidates.remove(word)
+            if not candidates:
+                del self.buckets[key]
+
+    def candidates(self, word):
+        """Return all dictionary words that share the word's confusion key."""
+        return self.buckets.get(confusion_key(word), [])
+
+    def lookup(self, word):
+        """
+        Return the dictionary word closest to the given word among those
+        sharing its confusion key, or None if there is no such word.
+        """
+        self.lookups += 1
+        candidates = self.candidates(word)
+        if not candidates:
+            return None
+        self.hits += 1
+        if len(candidates) == 1:
+            return candidates[0]
+        return max(candidates, key=lambda c: SequenceMatcher(None, word, c).ratio())
+
+    def stats(self):
+        """Return lookup counters and the hit rate of the index."""
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'misses': self.lookups - self.hits,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+        }
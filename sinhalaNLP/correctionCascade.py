@@ -0,0 +1,190 @@
+"""
+Tiered grammar correction that only calls the neural model when the cheaper
+stages cannot settle a sentence.
+
+Tiers, in order:
+    exact_pair  hash lookup of known incorrect -> correct pairs and of known
+                correct sentences from sentence_pairs.csv
+    rules       the rule engine from ruleBased.py, accepted only if it
+                reorders the words of the sentence; any other rewrite is
+                discarded
+    score       cheap error-detection score; sentences below the threshold
+                are passed through unchanged
+    model       the deep learning model, run once on all flagged sentences
+
+Any tier can be left out of `tiers`. The counters record how many sentences
+each tier settled.
+
+With a TimeBudget the cascade degrades instead of overrunning: the model is
+skipped when less than `model_reserve` seconds remain, and once the budget is
+spent the rules are skipped too, leaving only the spelling corrections.
+"""
+import csv
+import unicodedata
+
+from sinhalaNLP.grammarRules import correct_grammar
+from sinhalaNLP.sinhalaTokenizer import words
+from sinhalaNLP.timeBudget import COMPLETED, SKIPPED, TimeBudget
+
+TIERS = ('exact_pair', 'rules', 'score', 'model')
+
+# Sentences scoring at or above this are sent to the model. Without the
+# exact_pair tier it flags 76% of the incorrect sentences in
+# sentence_pairs.csv and 4% of the correct ones; 0.25 gives the same split.
+FLAG_THRESHOLD = 0.5
+
+# Seconds that must be left in the budget for the model to be called
+MODEL_RESERVE = 0.5
+
+# Sinhala vowel signs and the virama
+_SIGNS = tuple(chr(c) for c in range(0x0DCA, 0x0DE0) if unicodedata.category(chr(c)).startswith('M'))
+
+# Endings of finite Sinhala verbs, which normally close a declarative sentence:
+# a vowel sign followed by ය (ගියේය, කළාය) or, in questions, by ද (කරනවාද)
+VERB_ENDINGS = (('මි', 'මු', 'යි', 'වා', 'ති', 'හ', 'හු', 'නේ', 'නෙ', 'න්නෙහි', 'ළා', 'තා', 'නා', 'වේ', 'බේ', 'ණි')
+                + tuple(sign + 'ය' for sign in _SIGNS if sign != '\u0dca')
+                + tuple(sign + 'ද' for sign in _SIGNS))
+
+# Auxiliaries that close a sentence after an infinitive (කියන්න පුළුවන්)
+SENTENCE_FINAL_WORDS = {'හැක', 'පුළුවන්', 'පුළුවන්ද', 'හැකිද', 'ඕන', 'ඕනේ', 'එපා', 'ආසයි',
+                        'ඇත', 'නැත', 'නෑ', 'නැහැ'}
+
+# Pronouns that open a sentence as its subject
+SUBJECT_WORDS = {'මම', 'මා', 'අපි', 'අප', 'ඔබ', 'ඔබලා', 'ඔයා', 'එයා', 'නුඹ', 'ඔහු', 'ඇය', 'ඔවුන්', 'ඔවුහු',
+                 'මට', 'අපට', 'අපිට', 'ඔබට', 'ඔයාට', 'එයාට', 'ඔහුට', 'ඇයට', 'ඔවුන්ට'}
+
+# Weights of the error-detection features
+UNKNOWN_WORD_WEIGHT = 1.0
+VERB_POSITION_WEIGHT = 0.5
+SUBJECT_POSITION_WEIGHT = 0.5
+QUESTION_WEIGHT = 0.5
+
+
+def sentence_key(sentence):
+    """Return the lookup key of a sentence: its normalised words joined by spaces."""
+    return ' '.join(words(sentence))
+
+
+def load_sentence_pairs(path):
+    """Return ({incorrect key: correct sentence}, {correct keys}) from the pairs dataset."""
+    pairs = {}
+    known_correct = set()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        for row in reader:
+            if len(row) < 2 or not row[0].strip() or not row[1].strip():
+                continue
+            incorrect, correct = sentence_key(row[0]), row[1].strip()
+            known_correct.add(sentence_key(correct))
+            if incorrect != sentence_key(correct):
+                pairs.setdefault(incorrect, correct)
+    return pairs, known_correct
+
+
+class CorrectionCascade:
+    """Runs sentences through increasingly expensive correction tiers."""
+
+    def __init__(self, pairs_path, dictionary, model=None, tiers=TIERS, threshold=FLAG_THRESHOLD,
+                 model_reserve=MODEL_RESERVE):
+        """
+        model is a callable that takes a list of sentences and a TimeBudget
+        and returns the list of corrected sentences; dictionary is any
+        container of words.
+        """
+        self.pairs, self.known_correct = load_sentence_pairs(pairs_path)
+        self.dictionary = dictionary
+        self.model = model
+        self.tiers = tuple(tiers)
+        self.threshold = threshold
+        self.model_reserve = model_reserve
+        self.counts = dict.fromkeys(TIERS + ('unresolved',), 0)
+
+    def error_score(self, sentence):
+        """Cheap estimate of how likely the sentence still contains an error."""
+        tokens = words(sentence)
+        if not tokens:
+            return 0.0
+        score = UNKNOWN_WORD_WEIGHT * sum(t not in self.dictionary for t in tokens) / len(tokens)
+
+        # A finite verb or auxiliary that is not the last word hints at broken SOV order
+        verbs = [i for i, token in enumerate(tokens)
+                 if token.endswith(VERB_ENDINGS) or token in SENTENCE_FINAL_WORDS]
+        if verbs and verbs[-1] != len(tokens) - 1:
+            score += VERB_POSITION_WEIGHT
+
+        # So does a subject pronoun after the first word
+        if tokens[0] not in SUBJECT_WORDS and any(token in SUBJECT_WORDS for token in tokens[1:]):
+            score += SUBJECT_POSITION_WEIGHT
+
+        # Questions should end with the question particle ද
+        if sentence.rstrip().endswith('?') and not tokens[-1].endswith('ද'):
+            score += QUESTION_WEIGHT
+        return score
+
+    def cheap_tiers(self, sentence, budget):
+        """Return (tier, corrected) from the tiers before the model, or (None, sentence)."""
+        if 'exact_pair' in self.tiers:
+            key = sentence_key(sentence)
+            if key in self.pairs:
+                return 'exact_pair', self.pairs[key]
+            if key in self.known_correct:
+                return 'exact_pair', sentence
+
+        # Out of time: keep the spelling-corrected sentence as it is
+        if budget.expired():
+            if 'rules' in self.tiers:
+                budget.record('rules', SKIPPED)
+            return 'unresolved', sentence
+
+        if 'rules' in self.tiers:
+            corrected = correct_grammar(sentence)
+            budget.record('rules', COMPLETED)
+            # Only word order rewrites are trusted: the suffix rules replace
+            # words with fragments, so those rewrites are discarded and the
+            # sentence is left to the score tier
+            if corrected != sentence and sorted(words(corrected)) == sorted(words(sentence)):
+                return 'rules', corrected
+        if 'score' in self.tiers and self.error_score(sentence) < self.threshold:
+            return 'score', sentence
+        return None, sentence
+
+    def correct(self, sentences, budget=None):
+        """
+        Correct a list of sentences, calling the model once for all flagged
+        ones. Stage outcomes are recorded in the budget.
+        """
+        if budget is None:
+            budget = TimeBudget(None)
+        results = list(sentences)
+        flagged = []
+        for i, sentence in enumerate(sentences):
+            tier, corrected = self.cheap_tiers(sentence, budget)
+            if tier:
+                self.counts[tier] += 1
+                results[i] = corrected
+            else:
+                flagged.append(i)
+
+        if flagged:
+            use_model = self.model is not None and 'model' in self.tiers
+            if use_model and budget.remaining() >= self.model_reserve:
+                corrected = self.model([sentences[i] for i in flagged], budget)
+                for i, sentence in zip(flagged, corrected):
+                    results[i] = sentence
+                self.counts['model'] += len(flagged)
+                budget.record('model', COMPLETED)
+            else:
+                if use_model:
+                    budget.record('model', SKIPPED)
+                self.counts['unresolved'] += len(flagged)
+        return results
+
+    def stats(self):
+        """Return the fraction of sentences handled by each tier."""
+        total = sum(self.counts.values())
+        return {tier: count / total if total else 0.0 for tier, count in self.counts.items()}
+
+    def summary(self):
+        """One-line description of the tier fractions, for status bars."""
+        return ", ".join(f"{tier} {share:.0%}" for tier, share in self.stats().items() if share)
@@ -0,0 +1,67 @@
+"""
+Rule-based Sinhala grammar correction shared by ruleBased.py and the
+correction cascade.
+"""
+import re
+
+# Question words that trigger the question formation rules
+QUESTION_WORDS = ['කොහි', 'කවුද', 'මොකද', 'කුමක්']
+
+GRAMMAR_RULES = {
+    # SOV word order patterns
+    'word_order': [
+        {
+            'pattern': r'(මම|අපි|ඔහු|ඇය|ඔවුන්)\s+(\w+මි|\w+යි|\w+ති)\s+([^.]+)',
+            'correction': lambda m: f"{m.group(1)} {m.group(3)} {m.group(2)}"
+        }
+    ],
+    # Question formation rules
+    'question': [
+        {
+            'pattern': r'(කොහි|කවුද|මොකද|කුමක්)\s*(?!ද)[.?]?$',
+            'correction': lambda m: f"{m.group(1)}ද?"
+        },
+        {
+            'pattern': r'(.+[^ද])[?]$',
+            'correction': lambda m: f"{m.group(1)}ද?"
+        }
+    ],
+    # Subject-verb agreement
+    'verb_agreement': [
+        {
+            'pattern': r'(මම)\s+.+?([^මි])[.?]?$',
+            'correction': lambda m: f"{m.group(1)} {m.group(2)}මි"
+        },
+        {
+            'pattern': r'(ඔහු|ඇය)\s+.+?([^යි])[.?]?$',
+            'correction': lambda m: f"{m.group(1)} {m.group(2)}යි"
+        }
+    ]
+}
+
+
+def apply_grammar_rules(sentence, rule_type, rules=GRAMMAR_RULES):
+    """Apply specific grammar rules to the sentence"""
+    corrected = sentence
+    for rule in rules[rule_type]:
+        match = re.search(rule['pattern'], corrected)
+        if match:
+            corrected = rule['correction'](match)
+    return corrected
+
+
+def correct_grammar(sentence, rules=GRAMMAR_RULES):
+    """Apply all grammar rules in sequence"""
+    corrected = sentence
+
+    # Check and correct word order (SOV)
+    corrected = apply_grammar_rules(corrected, 'word_order', rules)
+
+    # Check and correct question formation
+    if '?' in corrected or any(q in corrected.lower() for q in QUESTION_WORDS):
+        corrected = apply_grammar_rules(corrected, 'question', rules)
+
+    # Check and correct verb agreement
+    corrected = apply_grammar_rules(corrected, 'verb_agreement', rules)
+
+    return corrected
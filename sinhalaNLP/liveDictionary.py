@@ -0,0 +1,235 @@
+"""
+Sinhala dictionary with a user/domain overlay that can change at runtime.
+
+Words are added or removed by appending "+word" / "-word" lines to an
+overlay file next to sinhalaDictionary.txt. Every process holding a
+LiveDictionary picks those lines up on refresh() and applies them to its word
+set and confusion index one word at a time, so no rebuild or restart is
+needed. Once the overlay grows past a threshold it is compacted: merged into
+the dictionary file, the index file is rewritten and the overlay emptied.
+Appending and compacting hold a lock file, so no process can append an entry
+between a compaction reading the overlay and emptying it.
+
+Usage:
+    python sinhalaNLP/liveDictionary.py add <word> [<word> ...]
+    python sinhalaNLP/liveDictionary.py remove <word> [<word> ...]
+    python sinhalaNLP/liveDictionary.py compact
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.confusionIndex import ConfusionIndex, index_path_for
+from sinhalaNLP.sinhalaTokenizer import normalize
+
+# File written next to sinhalaDictionary.txt for runtime additions and deletions
+DELTA_FILE_NAME = 'userDictionary.txt'
+
+# Number of overlay entries after which the overlay is merged into the dictionary
+COMPACT_THRESHOLD = 500
+
+# Seconds to wait for the overlay lock, and age after which a lock left
+# behind by a crashed process is removed
+LOCK_TIMEOUT = 10.0
+LOCK_STALE_AFTER = 60.0
+
+
+def delta_path_for(dictionary_path):
+    """Return the path of the overlay file that belongs to a dictionary file."""
+    return os.path.join(os.path.dirname(dictionary_path), DELTA_FILE_NAME)
+
+
+def _replace_file(path, lines):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+        for line in lines:
+            f.write(line + '\n')
+    os.replace(temp_path, path)
+
+
+@contextmanager
+def _file_lock(path, timeout=LOCK_TIMEOUT, stale_after=LOCK_STALE_AFTER):
+    """Hold an exclusive lock file, shared by all processes on the machine."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime > stale_after:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock {path} within {timeout} seconds")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+class LiveDictionary:
+    """Set-like view of the dictionary that follows changes to its overlay file."""
+
+    def __init__(self, dictionary_path, delta_path=None, compact_threshold=COMPACT_THRESHOLD):
+        self.dictionary_path = dictionary_path
+        self.delta_path = delta_path or delta_path_for(dictionary_path)
+        self.compact_threshold = compact_threshold
+
+        self._base_mtime = os.stat(dictionary_path).st_mtime_ns
+        with open(dictionary_path, 'r', encoding='utf-8') as f:
+            self.words = set(f.read().splitlines())
+        self.confusion_index = ConfusionIndex.for_dictionary(dictionary_path, self.words)
+
+        # Bytes of the overlay already applied and number of entries in it
+        self._delta_offset = 0
+        self.delta_entries = 0
+        self.refresh()
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _read_delta(self, offset):
+        """Return the complete overlay lines after offset and the offset past them."""
+        try:
+            with open(self.delta_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        # A line still being written by another process is left for later
+        end = data.rfind(b'\n') + 1
+        return data[:end].decode('utf-8').splitlines(), offset + end
+
+    @staticmethod
+    def _parse(line):
+        operation, word = line[:1], normalize(line[1:].strip())
+        if operation in '+-' and word:
+            return operation, word
+        return None
+
+    def _insert(self, word):
+        if word not in self.words:
+            self.words.add(word)
+            self.confusion_index.add(word)
+
+    def _delete(self, word):
+        if word in self.words:
+            self.words.discard(word)
+            self.confusion_index.remove(word)
+
+    def refresh(self):
+        """Apply overlay changes made since the last refresh, by any process."""
+        base_mtime = os.stat(self.dictionary_path).st_mtime_ns
+        try:
+            delta_size = os.path.getsize(self.delta_path)
+        except FileNotFoundError:
+            delta_size = 0
+
+        # Another process compacted the overlay into the dictionary file
+        if base_mtime != self._base_mtime or delta_size < self._delta_offset:
+            self._resync(base_mtime)
+            return
+
+        if delta_size == self._delta_offset:
+            return
+        lines, self._delta_offset = self._read_delta(self._delta_offset)
+        for line in lines:
+            entry = self._parse(line)
+            if entry:
+                operation, word = entry
+                if operation == '+':
+                    self._insert(word)
+                else:
+                    self._delete(word)
+                self.delta_entries += 1
+
+    def _resync(self, base_mtime):
+        """Re-read both files, updating the index only for words that differ."""
+        with open(self.dictionary_path, 'r', encoding='utf-8') as f:
+            target = set(f.read().splitlines())
+        lines, offset = self._read_delta(0)
+        entries = 0
+        for line in lines:
+            entry = self._parse(line)
+            if entry:
+                operation, word = entry
+                if operation == '+':
+                    target.add(word)
+                else:
+                    target.discard(word)
+                entries += 1
+
+        for word in self.words - target:
+            self._delete(word)
+        for word in target - self.words:
+            self._insert(word)
+        self._base_mtime = base_mtime
+        self._delta_offset = offset
+        self.delta_entries = entries
+
+    def _append(self, operation, word):
+        word = normalize(word.strip())
+        if not word:
+            raise ValueError("Cannot store an empty word in the dictionary")
+        with self._lock():
+            self.refresh()
+            with open(self.delta_path, 'a', encoding='utf-8', newline='\n') as f:
+                f.write(f"{operation}{word}\n")
+            self.refresh()
+            if self.compact_threshold and self.delta_entries >= self.compact_threshold:
+                self._compact()
+
+    def add(self, word):
+        """Add a word to the overlay and to this process's lookup structures."""
+        self._append('+', word)
+
+    def remove(self, word):
+        """Remove a word via the overlay and from this process's lookup structures."""
+        self._append('-', word)
+
+    def _lock(self):
+        return _file_lock(self.delta_path + '.lock')
+
+    def compact(self):
+        """Merge the overlay into the dictionary file, rewrite the index and empty the overlay."""
+        with self._lock():
+            self._compact()
+
+    def _compact(self):
+        # Called with the lock held, so the overlay cannot grow after refresh()
+        self.refresh()
+        _replace_file(self.dictionary_path, sorted(self.words))
+        self.confusion_index.save(index_path_for(self.dictionary_path))
+        _replace_file(self.delta_path, [])
+        self._base_mtime = os.stat(self.dictionary_path).st_mtime_ns
+        self._delta_offset = 0
+        self.delta_entries = 0
+
+
+if __name__ == '__main__':
+    default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'sinhalaDictionary_creation', 'sinhalaDictionary.txt')
+    if len(sys.argv) < 2 or sys.argv[1] not in ('add', 'remove', 'compact'):
+        print(__doc__)
+        sys.exit(1)
+
+    dictionary = LiveDictionary(default_path)
+    command, words = sys.argv[1], sys.argv[2:]
+    if command == 'compact':
+        dictionary.compact()
+    for word in words:
+        getattr(dictionary, command)(word)
+    print(f"{command}: done, {len(dictionary)} words, {dictionary.delta_entries} overlay entries")
@@ -0,0 +1,128 @@
+"""
+Sinhala tokenizer shared by the dictionary builder and all checkers.
+
+A token is a run of Sinhala characters. Zero-width joiners/non-joiners are
+kept inside a token so that conjuncts such as yansaya (්\u200Dය) and rakaransaya
+(්\u200Dර) are not split into fragments. Every token is NFC-normalised and stray
+joiners that do not follow an al-lakuna (්) are dropped.
+"""
+import os
+import re
+import sys
+import time
+import unicodedata
+
+# Sinhala runs, optionally glued together by ZWNJ/ZWJ
+TOKEN_PATTERN = re.compile(r'[\u0D80-\u0DFF]+(?:[\u200C\u200D]+[\u0D80-\u0DFF]+)*')
+
+# A joiner is only meaningful directly after an al-lakuna, and only once
+_JOINER_RUN = re.compile(r'(\u0DCA?)([\u200C\u200D]+)')
+
+# Characters read per chunk by iter_tokens
+CHUNK_SIZE = 1 << 16
+
+
+def _keep_last_joiner(match):
+    return match.group(1) + match.group(2)[-1] if match.group(1) else ''
+
+
+def normalize(token):
+    """Return the NFC form of a token without stray joiners."""
+    if not unicodedata.is_normalized('NFC', token):
+        token = unicodedata.normalize('NFC', token)
+    if '\u200C' in token or '\u200D' in token:
+        token = _JOINER_RUN.sub(_keep_last_joiner, token)
+    return token
+
+
+def tokenize(text):
+    """Yield (token, start, end) for every Sinhala token in the text."""
+    for match in TOKEN_PATTERN.finditer(text):
+        yield normalize(match.group()), match.start(), match.end()
+
+
+def words(text):
+    """Return the normalised Sinhala tokens of the text as a list."""
+    return [normalize(token) for token in TOKEN_PATTERN.findall(text)]
+
+
+def word_text(text):
+    """Return the words of the text joined by single spaces, without punctuation."""
+    return ' '.join(words(text))
+
+
+def iter_tokens(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield (token, start, end) for every Sinhala token read from a text stream.
+    Offsets are character offsets from the start of the stream. A token that
+    crosses a chunk boundary is held back until it is complete.
+    """
+    offset = 0
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        text = pending + chunk
+        if not text:
+            return
+        # A token may continue in the next chunk if only joiners follow it
+        limit = len(text.rstrip('\u200C\u200D'))
+        last_end = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            if chunk and match.end() == limit:
+                break
+            last_end = match.end()
+            yield normalize(match.group()), offset + match.start(), offset + last_end
+        else:
+            last_end = len(text)
+        if not chunk:
+            return
+        pending = text[last_end:]
+        offset += last_end
+
+
+def replace_spans(text, spans, replacements):
+    """
+    Return the text with every (token, start, end) span replaced by the
+    matching entry of replacements. Text between spans is kept as it is.
+    """
+    pieces = []
+    last = 0
+    for (_, start, end), replacement in zip(spans, replacements):
+        pieces.append(text[last:start])
+        pieces.append(replacement)
+        last = end
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+
+def sub_tokens(text, replace):
+    """Return the text with every token replaced by replace(token)."""
+    spans = list(tokenize(text))
+    return replace_spans(text, spans, [replace(token) for token, _, _ in spans])
+
+
+def benchmark(paths, repeat=3):
+    """Tokenize the given files and return (megabytes, tokens, MB/s) of the best run."""
+    size = sum(os.path.getsize(path) for path in paths)
+    best = float('inf')
+    count = 0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for _ in iter_tokens(f):
+                    count += 1
+        best = min(best, time.perf_counter() - start)
+    megabytes = size / 1e6
+    return megabytes, count, megabytes / best
+
+
+if __name__ == '__main__':
+    # Benchmark on the dictionary corpus, or on the files given as arguments
+    corpus = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'sinhalaDictionary_creation', 'textfiles')
+    files = sys.argv[1:] or sorted(os.path.join(corpus, name) for name in os.listdir(corpus)
+                                   if name.endswith('.txt'))
+    megabytes, count, speed = benchmark(files)
+    print(f"Tokenized {megabytes:.2f} MB into {count} tokens at {speed:.1f} MB/s")
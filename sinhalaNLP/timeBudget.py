@@ -0,0 +1,94 @@
+"""
+Per-request time budgets for the correction APIs.
+
+A TimeBudget is created when a request starts and passed down to every stage.
+Long searches check it periodically and return the best result found so far
+once it has run out, and the pipeline skips stages it can no longer afford.
+Each stage records whether it completed, so the response can report which
+parts of the correction actually ran.
+"""
+import time
+from difflib import SequenceMatcher
+
+# Seconds allowed for one interactive correction request
+DEFAULT_BUDGET = 2.0
+
+# Fraction of a request's budget the spelling search may use, so the grammar
+# stages that run after it still get the rest
+SPELLING_SHARE = 0.5
+
+COMPLETED = 'completed'
+PARTIAL = 'partial'
+SKIPPED = 'skipped'
+
+
+class TimeBudget:
+    """Deadline for one request plus the completion status of each stage."""
+
+    def __init__(self, seconds=DEFAULT_BUDGET):
+        self.seconds = seconds
+        self.start = time.monotonic()
+        self.deadline = None if seconds is None else self.start + seconds
+        self.stages = {}
+
+    def remaining(self):
+        """Seconds left before the deadline (infinite without a budget)."""
+        if self.deadline is None:
+            return float('inf')
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def share(self, fraction):
+        """
+        Return a budget for an early stage that ends once fraction of this
+        budget has passed, leaving the rest for the stages after it. Stage
+        outcomes recorded on it are reported by this budget.
+        """
+        stage_budget = TimeBudget(None)
+        stage_budget.start = self.start
+        stage_budget.stages = self.stages
+        if self.deadline is not None:
+            stage_budget.seconds = self.seconds * fraction
+            stage_budget.deadline = min(self.start + stage_budget.seconds, self.deadline)
+        return stage_budget
+
+    def record(self, stage, status):
+        """
+        Record the outcome of one run of a stage. A stage that completed for
+        some inputs and not for others is reported as partial.
+        """
+        previous = self.stages.get(stage)
+        self.stages[stage] = status if previous in (None, status) else PARTIAL
+
+    def report(self):
+        """One-line description of the stage outcomes, for status bars and dialogs."""
+        stages = ", ".join(f"{stage}: {status}" for stage, status in self.stages.items())
+        return f"{stages} ({self.elapsed():.2f}s)" if stages else f"({self.elapsed():.2f}s)"
+
+
+def closest_match(word, possibilities, cutoff=0.6, budget=None, check_every=1024):
+    """
+    Return (best, completed): the possibility most similar to word with a
+    difflib ratio of at least cutoff, or None, the same result as
+    get_close_matches(word, possibilities, n=1, cutoff=cutoff). The search
+    stops at the budget's deadline, in which case completed is False and best
+    is the best match found so far.
+    """
+    matcher = SequenceMatcher()
+    matcher.set_seq2(word)
+    best, best_score = None, cutoff
+    for i, candidate in enumerate(possibilities):
+        if budget is not None and i % check_every == 0 and budget.expired():
+            return best, False
+        matcher.set_seq1(candidate)
+        if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+            continue
+        score = matcher.ratio()
+        if score >= best_score and (best is None or (score, candidate) > (best_score, best)):
+            best, best_score = candidate, score
+    return best, True
@@ -0,0 +1,282 @@
+"""
+Token-level alignment between an original and a corrected text.
+
+Both texts are tokenized with the shared Sinhala tokenizer, every distinct
+token is mapped to an integer id and the two id sequences are diffed with
+Myers' algorithm, which takes O((N+D)·D) time and O(N) memory for N tokens
+and D edits. Common prefixes and suffixes are stripped first, so long texts
+with a few corrections stay cheap. A token deleted in one place and inserted
+nearby is reported as a move, so SOV reordering does not show up as a run of
+replacements. Remaining deletions and insertions between the same two
+unchanged tokens are paired up as replacements.
+
+Usage:
+    python sinhalaNLP/tokenAlignment.py <original.txt> <corrected.txt> [--json]
+"""
+import json
+import os
+import sys
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.sinhalaTokenizer import tokenize
+
+# op is one of 'equal', 'replace', 'insert', 'delete' or 'move'. Indices are
+# token positions and spans are (start, end) character offsets in the
+# original (source) and corrected (target) text; None where not applicable.
+Edit = namedtuple('Edit', 'op source target source_index target_index source_span target_span')
+
+# Ranges longer than this (both sequences together) are first split on tokens
+# that occur once in each, which keeps long texts with scattered edits fast
+ANCHOR_MIN_LENGTH = 256
+
+# Largest distance in tokens between a deletion and an insertion of the same
+# token for the pair to be reported as a move
+MOVE_WINDOW = 20
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi):
+    """
+    Return (x, y, u, v): the middle snake of a shortest edit script between
+    a[alo:ahi] and b[blo:bhi], from (x, y) to (u, v) in range-relative
+    coordinates. Forward and reverse searches meet in the middle, so only two
+    rows of furthest-reaching points are kept.
+    """
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    odd = delta % 2 == 1
+    offset = (n + m + 1) // 2 + 1
+    forward = [0] * (2 * offset + 1)
+    reverse = [0] * (2 * offset + 1)
+    for d in range(offset):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            # Reverse diagonal delta - k was reached in d - 1 steps
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + reverse[offset + delta - k] >= n:
+                return start_x, start_y, x, y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and reverse[offset + k - 1] < reverse[offset + k + 1]):
+                x = reverse[offset + k + 1]
+            else:
+                x = reverse[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            reverse[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return n - x, m - y, n - start_x, m - start_y
+    raise AssertionError("no middle snake found")
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """
+    Return the (i, j) pairs of tokens that occur exactly once in both ranges,
+    reduced to the longest run that is increasing in both sequences.
+    """
+    counts = {}
+    for i in range(alo, ahi):
+        counts[a[i]] = counts.get(a[i], 0) + 1
+    positions = {}
+    for j in range(blo, bhi):
+        if counts.get(b[j]) == 1:
+            positions[b[j]] = None if b[j] in positions else j
+    pairs = [(i, positions[a[i]]) for i in range(alo, ahi)
+             if counts[a[i]] == 1 and positions.get(a[i]) is not None]
+
+    # Longest increasing subsequence of the b positions (patience sorting)
+    tails, tail_index, previous = [], [], [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile:
+            previous[index] = tail_index[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+    anchors = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _push_anchored(stack, a, alo, ahi, b, blo, bhi):
+    """Split a range on its unique common tokens; return False if there are none."""
+    anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+    if not anchors:
+        return False
+    tasks = []
+    for i, j in anchors:
+        tasks.append(('diff', alo, i, blo, j))
+        tasks.append(('equal', i, j, 1))
+        alo, blo = i + 1, j + 1
+    tasks.append(('diff', alo, ahi, blo, bhi))
+    stack.extend(reversed(tasks))
+    return True
+
+
+def diff_ids(a, b):
+    """
+    Edit script between two integer sequences as (op, i, j) tuples. Common
+    ends of every subrange are stripped, long subranges are split on tokens
+    that occur once in both (as in patience diff) and the rest is diffed with
+    Myers' linear-space divide and conquer: O((N+D)·D) time and O(N) memory.
+    The script is the shortest one for inputs up to ANCHOR_MIN_LENGTH tokens
+    and close to it beyond that.
+    """
+    script = []
+    # Subranges to diff and runs of equal tokens, in reverse order of output
+    stack = [('diff', 0, len(a), 0, len(b))]
+    while stack:
+        task = stack.pop()
+        if task[0] == 'equal':
+            _, i, j, length = task
+            script.extend(('equal', i + s, j + s) for s in range(length))
+            continue
+
+        _, alo, ahi, blo, bhi = task
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            script.append(('equal', alo, blo))
+            alo += 1
+            blo += 1
+        suffix = 0
+        while alo < ahi - suffix and blo < bhi - suffix and a[ahi - 1 - suffix] == b[bhi - 1 - suffix]:
+            suffix += 1
+        ahi -= suffix
+        bhi -= suffix
+        stack.append(('equal', ahi, bhi, suffix))
+
+        if alo == ahi:
+            script.extend(('insert', None, j) for j in range(blo, bhi))
+        elif blo == bhi:
+            script.extend(('delete', i, None) for i in range(alo, ahi))
+        elif ahi - alo + bhi - blo > ANCHOR_MIN_LENGTH and _push_anchored(stack, a, alo, ahi, b, blo, bhi):
+            pass
+        else:
+            # Both ends differ, so at least two edits remain and each half is smaller
+            x, y, u, v = _middle_snake(a, alo, ahi, b, blo, bhi)
+            stack.append(('diff', alo + u, ahi, blo + v, bhi))
+            stack.append(('equal', alo + x, blo + y, u - x))
+            stack.append(('diff', alo, alo + x, blo, blo + y))
+    return script
+
+
+def align(original, corrected):
+    """Return the list of Edit records that turn the original text into the corrected one."""
+    source = list(tokenize(original))
+    target = list(tokenize(corrected))
+    ids = {}
+    a = [ids.setdefault(token, len(ids)) for token, _, _ in source]
+    b = [ids.setdefault(token, len(ids)) for token, _, _ in target]
+    script = diff_ids(a, b)
+
+    # Pair each inserted token with the nearest deletion of the same token
+    # within MOVE_WINDOW tokens, so repeated common words far apart are not
+    # reported as long-range moves
+    deleted = defaultdict(list)
+    for op, i, _ in script:
+        if op == 'delete':
+            deleted[a[i]].append(i)
+    moved_from = {}
+    position = 0  # Source tokens consumed so far
+    for op, i, j in script:
+        if op == 'insert' and deleted[b[j]]:
+            candidates = deleted[b[j]]
+            nearest = bisect_left(candidates, position)
+            best = min(candidates[max(nearest - 1, 0):nearest + 1], key=lambda c: abs(c - position))
+            if abs(best - position) <= MOVE_WINDOW:
+                moved_from[j] = best
+                candidates.remove(best)
+        elif op != 'insert':
+            position = i + 1
+    moved = set(moved_from.values())
+
+    def edit(op, i, j):
+        return Edit(op,
+                    None if i is None else source[i][0],
+                    None if j is None else target[j][0],
+                    i, j,
+                    None if i is None else source[i][1:],
+                    None if j is None else target[j][1:])
+
+    edits = []
+    deletes, inserts = [], []
+
+    def flush():
+        # Deletions and insertions between the same unchanged tokens are replacements
+        for i, j in zip(deletes, inserts):
+            edits.append(edit('replace', i, j))
+        edits.extend(edit('delete', i, None) for i in deletes[len(inserts):])
+        edits.extend(edit('insert', None, j) for j in inserts[len(deletes):])
+        deletes.clear()
+        inserts.clear()
+
+    for op, i, j in script:
+        if op == 'equal':
+            flush()
+            edits.append(edit('equal', i, j))
+        elif op == 'delete':
+            if i not in moved:
+                deletes.append(i)
+        elif j in moved_from:
+            edits.append(edit('move', moved_from[j], j))
+        else:
+            inserts.append(j)
+    flush()
+    return edits
+
+
+def changes(original, corrected):
+    """Return only the edits that change something."""
+    return [edit for edit in align(original, corrected) if edit.op != 'equal']
+
+
+def describe(edit):
+    """Human-readable one-line description of an edit."""
+    if edit.op == 'replace':
+        return f"{edit.source} → {edit.target}"
+    if edit.op == 'insert':
+        return f"+ {edit.target}"
+    if edit.op == 'delete':
+        return f"- {edit.source}"
+    if edit.op == 'move':
+        return f"{edit.source}: {edit.source_index + 1} → {edit.target_index + 1}"
+    return edit.source
+
+
+def to_json(edits):
+    """Serialise edits as a JSON list of objects."""
+    return json.dumps([edit._asdict() for edit in edits], ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        original_text = f.read()
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        corrected_text = f.read()
+
+    found = changes(original_text, corrected_text)
+    if '--json' in sys.argv[3:]:
+        print(to_json(found))
+    else:
+        for change in found:
+            print(describe(change))
@@ -1,26 +1,34 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import re
-from difflib import get_close_matches
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.liveDictionary import LiveDictionary
+from sinhalaNLP.sinhalaTokenizer import sub_tokens, words as extract_sinhala_words
+from sinhalaNLP.timeBudget import COMPLETED, DEFAULT_BUDGET, PARTIAL, TimeBudget, closest_match
 
 # Load the Sinhala dictionary
 dictionary_path = r'sinhalaDictionary_creation\sinhalaDictionary.txt'#path to dictionary
 
 try:
-    with open(dictionary_path, 'r', encoding='utf-8') as dict_file:
-        sinhala_dictionary = set(dict_file.read().splitlines())
+    # Dictionary words plus the user overlay, kept up to date at runtime
+    sinhala_dictionary = LiveDictionary(dictionary_path)
 except FileNotFoundError:
     messagebox.showerror("Error", f"Dictionary file not found at {dictionary_path}")
     exit()
 
-# Function to extract Sinhala words
-def extract_sinhala_words(text):
-    sinhala_words = re.findall(r'[\u0D80-\u0DFF]+', text)
-    return sinhala_words
+# Seconds allowed per correction request
+correction_budget = DEFAULT_BUDGET
+
+# Confusion-set index for common substitution errors
+confusion_index = sinhala_dictionary.confusion_index
 
 # Function to find and correct spelling mistakes
 def correct_spelling():
     text_content = text_box.get("1.0", tk.END).strip()  # Get text from the text box
+    budget = TimeBudget(correction_budget)
+    sinhala_dictionary.refresh()  # Pick up overlay changes made since the last check
     words = extract_sinhala_words(text_content)  # Extract Sinhala words
     corrected_text = text_content
 
@@ -28,16 +36,22 @@ def correct_spelling():
     corrections = {}
 
     for word in misspelled_words:
-        # Find closest matches from the dictionary
-        suggestions = get_close_matches(word, sinhala_dictionary, n=1, cutoff=0.7)
-        if suggestions:
-            corrections[word] = suggestions[0]  # Auto-correct to the closest match
+        # Most misspellings only mix up confusable letters
+        match = confusion_index.lookup(word)
+        if match:
+            corrections[word] = match
+            continue
+
+        # Find closest match from the dictionary, stopping at the deadline
+        suggestion, completed = closest_match(word, sinhala_dictionary, cutoff=0.7, budget=budget)
+        budget.record('spelling', COMPLETED if completed else PARTIAL)
+        if suggestion:
+            corrections[word] = suggestion  # Auto-correct to the closest match
         else:
             corrections[word] = word  # Leave unchanged if no match found
 
-    # Replace misspelled words in the text
-    for incorrect, correct in corrections.items():
-        corrected_text = corrected_text.replace(incorrect, correct)
+    # Replace misspelled words in the text, token by token
+    corrected_text = sub_tokens(corrected_text, lambda token: corrections.get(token, token))
 
     # Display the corrected text in the text box
     text_box.delete("1.0", tk.END)
@@ -46,10 +60,25 @@ def correct_spelling():
     # Show a message with corrections
     correction_message = "\n".join([f"{incorrect} -> {correct}" for incorrect, correct in corrections.items()])
     if correction_message:
-        messagebox.showinfo("Corrections Made", f"Auto-corrected the following words:\n\n{correction_message}")
+        hit_rate = confusion_index.stats()['hit_rate']
+        messagebox.showinfo("Corrections Made", f"Auto-corrected the following words:\n\n{correction_message}"
+                            f"\n\nConfusion index hit rate: {hit_rate:.0%}\n{budget.report()}")
     else:
         messagebox.showinfo("No Corrections", "No misspelled words found.")
 
+# Function to add the selected word to the user dictionary
+def add_to_dictionary():
+    try:
+        selection = text_box.get(tk.SEL_FIRST, tk.SEL_LAST)
+    except tk.TclError:
+        messagebox.showwarning("No Selection", "Select a word to add to the dictionary.")
+        return
+    added = extract_sinhala_words(selection)
+    for word in added:
+        sinhala_dictionary.add(word)
+    if added:
+        messagebox.showinfo("Dictionary Updated", f"Added to dictionary: {', '.join(added)}")
+
 # Function to open a text file and load its content into the text box
 def open_file():
     file_path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
@@ -86,6 +115,9 @@ open_button.pack(side=tk.LEFT, padx=5)
 check_button = tk.Button(button_frame, text="Correct Spelling", command=correct_spelling, bg="#4CAF50", fg="white", padx=10, pady=5)
 check_button.pack(side=tk.LEFT, padx=5)
 
+add_button = tk.Button(button_frame, text="Add to Dictionary", command=add_to_dictionary, bg="#FF9800", fg="white", padx=10, pady=5)
+add_button.pack(side=tk.LEFT, padx=5)
+
 save_button = tk.Button(button_frame, text="Save File", command=save_file, bg="#f44336", fg="white", padx=10, pady=5)
 save_button.pack(side=tk.LEFT, padx=5)
 
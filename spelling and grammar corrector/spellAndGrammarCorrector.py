@@ -2,20 +2,34 @@ import tkinter as tk
 from tkinter import scrolledtext, messagebox
 import tensorflow as tf
 import json
+import os
+import sys
 import numpy as np
 from keras.models import load_model
 from keras.preprocessing.sequence import pad_sequences
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sinhalaNLP.compiledModel import CompiledModel
+from sinhalaNLP.correctionCascade import CorrectionCascade
+from sinhalaNLP.liveDictionary import LiveDictionary
+from sinhalaNLP.sinhalaTokenizer import replace_spans, sub_tokens, tokenize, words
+from sinhalaNLP.timeBudget import COMPLETED, DEFAULT_BUDGET, PARTIAL, SPELLING_SHARE, TimeBudget
+from sinhalaNLP.tokenAlignment import changes as token_changes, describe
+
 class SinhalaAutoCorrector:
     def __init__(self, root):
         self.root = root
         self.root.title("සිංහල ස්වයංක්‍රීය වචන හා ව්‍යාකරණ නිවැරදි කිරීම")
         self.root.geometry("800x600")
+        self.max_sequence_length = 100  # Used only if the model does not fix it itself
+        self.correction_budget = DEFAULT_BUDGET  # Seconds allowed per request
         
         try:
-            # Load dictionary of correct words
-            with open('sinhalaDictionary_creation\sinhalaDictionary.txt', 'r', encoding='utf-8') as f:
-                self.dictionary = set(f.read().splitlines())
+            # Load dictionary of correct words, including the user overlay
+            self.dictionary = LiveDictionary('sinhalaDictionary_creation\sinhalaDictionary.txt')
+            
+            # Confusion-set index for common substitution errors
+            self.confusion_index = self.dictionary.confusion_index
             
             # Load correct sentences for reference
             with open('grammar_dataset\correctSentences.txt', 'r', encoding='utf-8') as f:
@@ -28,12 +42,20 @@ class SinhalaAutoCorrector:
             # Load grammar model
             self.model = load_model('models\grammar_correction_model_final.keras')
             
+            # Trace and warm up fixed-shape inference functions once at load time,
+            # with the input shapes taken from the model itself
+            self.compiled_model = CompiledModel(self.model, self.max_sequence_length)
+            self.max_sequence_length = self.compiled_model.sequence_length
+            
+            # Cheaper tiers settle most sentences before the model is called
+            self.cascade = CorrectionCascade('grammar_dataset\sentence_pairs.csv', self.dictionary,
+                                             model=self.correct_grammar_batch)
+            
         except Exception as e:
             messagebox.showerror("Error", f"Error loading resources: {str(e)}")
             return
 
         self.setup_gui()
-        self.max_sequence_length = 100
 
     def setup_gui(self):
         # Input area
@@ -74,22 +96,37 @@ class SinhalaAutoCorrector:
                                                    wrap=tk.WORD)
         self.output_text.pack(pady=5, fill=tk.BOTH, expand=True)
 
-    def correct_spelling(self, word):
+        # Share of sentences settled by each correction tier
+        self.tier_label = tk.Label(self.root, text="", font=("Iskoola Pota", 10))
+        self.tier_label.pack(pady=5)
+
+    def correct_spelling(self, word, budget=None):
         if word in self.dictionary:
             return word
             
+        # Most misspellings only mix up confusable letters
+        match = self.confusion_index.lookup(word)
+        if match:
+            return match
+            
         best_match = word
         min_distance = float('inf')
         
-        for dict_word in self.dictionary:
+        for i, dict_word in enumerate(self.dictionary):
+            # Stop at the deadline and keep the best match found so far
+            if budget is not None and i % 1024 == 0 and budget.expired():
+                budget.record('spelling', PARTIAL)
+                return best_match
             distance = self.levenshtein_distance(word, dict_word)
             if distance < min_distance and distance <= 2:
                 min_distance = distance
                 best_match = dict_word
                 
+        if budget is not None:
+            budget.record('spelling', COMPLETED)
         return best_match
 
-    def correct_grammar(self, sentence):
+    def correct_grammar(self, sentence, budget=None):
         # First try to find an exact match in correct sentences
         for correct_sent in self.correct_sentences:
             if self.similarity_score(sentence, correct_sent) > 0.8:
@@ -97,37 +134,42 @@ class SinhalaAutoCorrector:
         
         # If no match found, use model for correction
         try:
-            tokens = sentence.split()
-            corrected_tokens = []
+            spans = list(tokenize(sentence))
+            tokens = [token for token, _, _ in spans]
+            if not tokens:
+                return sentence
             
-            for i, token in enumerate(tokens):
-                # Get context (previous and next words)
-                context = tokens[max(0, i-2):i] + tokens[i+1:i+3]
-                
-                # Prepare input for model
-                sequence = self.prepare_sequence(token, context)
-                prediction = self.model.predict(sequence, verbose=0)
-                
-                if prediction[0][0] < 0.5:
+            # Get context (previous and next words) of every token
+            contexts = [tokens[max(0, i-2):i] + tokens[i+1:i+3] for i in range(len(tokens))]
+            
+            # Score all tokens of the sentence in one model call
+            sequences = [self.prepare_sequence(token, context) for token, context in zip(tokens, contexts)]
+            padded = np.concatenate([sequence[0] for sequence in sequences])
+            mask = np.concatenate([sequence[1] for sequence in sequences])
+            predictions = self.compiled_model(padded, mask)
+            
+            corrected_tokens = []
+            for token, context, prediction in zip(tokens, contexts, predictions):
+                if prediction[0] < 0.5:
                     # Find best replacement from dictionary
-                    corrected_token = self.find_best_replacement(token, context)
+                    corrected_token = self.find_best_replacement(token, context, budget)
                     corrected_tokens.append(corrected_token)
                 else:
                     corrected_tokens.append(token)
             
-            return ' '.join(corrected_tokens)
+            return replace_spans(sentence, spans, corrected_tokens)
             
         except Exception:
             # If model fails, use similarity-based correction
             return self.find_similar_sentence(sentence)
 
+    def correct_grammar_batch(self, sentences, budget=None):
+        return [self.correct_grammar(sentence, budget) for sentence in sentences]
+
     def prepare_sequence(self, word, context):
-        # Combine word and context
-        text = ' '.join([word] + context)
-        
-        # Convert to sequence using tokenizer
+        # Convert word and context to sequence using tokenizer
         sequence = []
-        for w in text.split():
+        for w in [word] + context:
             if w in self.tokenizer:
                 sequence.append(self.tokenizer[w])
             else:
@@ -141,17 +183,23 @@ class SinhalaAutoCorrector:
         
         return [padded, mask]
 
-    def find_best_replacement(self, word, context):
+    def find_best_replacement(self, word, context, budget=None):
         best_word = word
         best_score = float('-inf')
         
-        for correct_word in self.dictionary:
+        for i, correct_word in enumerate(self.dictionary):
+            # Stop at the deadline and keep the best replacement found so far
+            if budget is not None and i % 64 == 0 and budget.expired():
+                budget.record('replacement_search', PARTIAL)
+                return best_word
             if abs(len(correct_word) - len(word)) <= 2:
                 score = self.context_similarity_score(correct_word, context)
                 if score > best_score:
                     best_score = score
                     best_word = correct_word
                     
+        if budget is not None:
+            budget.record('replacement_search', COMPLETED)
         return best_word
 
     def auto_correct(self):
@@ -160,19 +208,23 @@ class SinhalaAutoCorrector:
             messagebox.showwarning("Warning", "කරුණාකර පාඨයක් ඇතුළත් කරන්න")
             return
             
+        budget = TimeBudget(self.correction_budget)
+        # Spelling may only use part of it, so the grammar tiers still run
+        spelling_budget = budget.share(SPELLING_SHARE)
+        
+        # Pick up words added to or removed from the overlay since the last run
+        self.dictionary.refresh()
+        
         # Split into sentences
         sentences = [s.strip() for s in text.split('.') if s.strip()]
-        corrected_sentences = []
         
-        for sentence in sentences:
-            # First correct spelling of each word
-            words = sentence.split()
-            corrected_words = [self.correct_spelling(word) for word in words]
-            spell_corrected = ' '.join(corrected_words)
-            
-            # Then correct grammar
-            grammar_corrected = self.correct_grammar(spell_corrected)
-            corrected_sentences.append(grammar_corrected)
+        # First correct spelling of each word
+        spell_corrected = [sub_tokens(sentence, lambda word: self.correct_spelling(word, spelling_budget))
+                           for sentence in sentences]
+        
+        # Then correct grammar, using the model only for flagged sentences
+        corrected_sentences = self.cascade.correct(spell_corrected, budget)
+        self.tier_label.config(text=f"{self.cascade.summary()}\n{budget.report()}")
         
         # Join sentences and display
         final_text = '. '.join(corrected_sentences) + '.'
@@ -183,24 +235,19 @@ class SinhalaAutoCorrector:
         self.show_corrections(text, final_text)
 
     def show_corrections(self, original, corrected):
-        changes = []
-        orig_words = original.split()
-        corr_words = corrected.split()
-        
-        for orig, corr in zip(orig_words, corr_words):
-            if orig != corr:
-                changes.append(f"{orig} → {corr}")
+        # Align tokens so insertions and reordering do not shift later words
+        changes = [describe(edit) for edit in token_changes(original, corrected)]
         
         if changes:
             messagebox.showinfo("නිවැරදි කිරීම්", "\n".join(changes))
 
     def similarity_score(self, s1, s2):
         # Calculate similarity between two sentences
-        words1 = set(s1.split())
-        words2 = set(s2.split())
+        words1 = set(words(s1))
+        words2 = set(words(s2))
         intersection = words1.intersection(words2)
         union = words1.union(words2)
-        return len(intersection) / len(union)
+        return len(intersection) / len(union) if union else 0
 
     def context_similarity_score(self, word, context):
         # Calculate how well a word fits in the given context